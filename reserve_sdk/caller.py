@@ -0,0 +1,111 @@
+from eth_abi import decode_abi
+from eth_abi.exceptions import DecodingError
+from eth_utils import encode_hex, function_abi_to_4byte_selector
+from web3.exceptions import BadFunctionCallOutput, ValidationError
+from web3.utils.abi import (
+    check_if_arguments_can_be_encoded, filter_by_name, filter_by_type,
+    get_abi_output_types, map_abi_data)
+from web3.utils.contracts import encode_abi
+from web3.utils.normalizers import BASE_RETURN_NORMALIZERS
+
+
+def decode_output(contract, fn_abi, data):
+    """Decode the return data of a contract function call the same way
+    web3 does for ContractFunction.call().
+
+    Args:
+        contract: the contract which owns the function
+        fn_abi: the ABI of the function
+        data: the raw return data
+
+    Returns the decoded value, or a list of values if the function has
+    several outputs. Raises BadFunctionCallOutput if data can not be
+    decoded, eg: there is no contract at the address.
+    """
+    output_types = get_abi_output_types(fn_abi)
+    try:
+        decoded = decode_abi(output_types, data)
+    except DecodingError as e:
+        if not data and not contract.web3.eth.getCode(contract.address):
+            msg = (
+                'Could not transact with/call contract function, is contract '
+                'deployed correctly and chain synced?'
+            )
+        else:
+            msg = (
+                'Could not decode contract function call {} return data {} '
+                'for output_types {}'.format(
+                    fn_abi['name'], data, output_types)
+            )
+        raise BadFunctionCallOutput(msg) from e
+    output = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    if len(output) == 1:
+        return output[0]
+    return output
+
+
+class ContractCaller:
+    """ContractCaller calls view functions of a contract directly through
+    eth_call, like contract.caller of later web3 versions.
+
+    The ABI and selector of a function are resolved once, on first use,
+    instead of on every contract.functions.<name>(...) call. Arguments are
+    still validated and normalized by web3, so e.g. a non-checksum address
+    raises InvalidAddress.
+
+    Example: caller.getBalance(token) returns the decoded balance.
+    """
+
+    def __init__(self, contract):
+        """Create new ContractCaller instance.
+
+        :arg contract: the web3 contract instance
+        """
+        self.contract = contract
+        self._functions = {}
+
+    def __getattr__(self, fn_name):
+        if fn_name.startswith('_'):
+            raise AttributeError(fn_name)
+        if fn_name not in self._functions:
+            self._functions[fn_name] = self._build_function(fn_name)
+        return self._functions[fn_name]
+
+    def _build_function(self, fn_name):
+        fn_abis = filter_by_name(
+            fn_name, filter_by_type('function', self.contract.abi))
+        if len(fn_abis) != 1:
+            raise AttributeError(
+                'Contract has no unique function named {}'.format(fn_name))
+
+        w3 = self.contract.web3
+        address = self.contract.address
+        fn_abi = fn_abis[0]
+        selector = encode_hex(function_abi_to_4byte_selector(fn_abi))
+
+        def call(*args):
+            if not check_if_arguments_can_be_encoded(fn_abi, args, {}):
+                raise ValidationError(
+                    'Could not call function {} with positional argument(s) '
+                    'of type {}'.format(fn_name, tuple(map(type, args))))
+            return_data = w3.eth.call({
+                'to': address,
+                'data': encode_abi(w3, fn_abi, args, selector)
+            })
+            return decode_output(self.contract, fn_abi, return_data)
+
+        return call
+
+
+def get_caller(contract):
+    """Return the ContractCaller of a contract instance, created once and
+    kept with the contract so that calls share its resolved functions.
+
+    Args:
+        contract: the web3 contract instance
+    """
+    caller = contract.__dict__.get('_reserve_sdk_caller')
+    if caller is None:
+        caller = contract.__dict__.setdefault(
+            '_reserve_sdk_caller', ContractCaller(contract))
+    return caller
@@ -1,15 +1,28 @@
+import functools
+import json
+import os
+import tempfile
 from collections import namedtuple
 from concurrent import futures
 
+from eth_utils import keccak, to_canonical_address
 from web3 import Web3
+from web3.utils.validation import validate_address
 
+from . import multicall
+from .caller import get_caller
 from .contract_code import (
-    RESERVE_CODE, CONVERSION_RATES_CODE, SANITY_RATES_CODE)
+    RESERVE_CODE, CONVERSION_RATES_CODE, SANITY_RATES_CODE,
+    get_contract_factory)
 from .utils import hexlify, call_contract
 
 
+"""Maximum concurrent requests of a batch call without Multicall3."""
+MAX_CONCURRENT_CALLS = 16
+
 """Show token position in the compact data."""
 TokenIndex = namedtuple('TokenIndex', ('array_idx', 'field_idx'))
+"""New base rate and compact value of a buy or sell rate."""
 CompactData = namedtuple('CompactData', ('base', 'compact', 'base_changed'))
 
 
@@ -25,22 +38,162 @@ def get_compact_data(rate, base):
         compact_data which include new base rate & compact value which is the
         different between rate and base in bps unit.
     """
-    if base == 0:
-        return CompactData(rate, 0, base_changed=(base != rate))
+    new_bases, compacts, base_changed = get_compact_data_batch([rate], [base])
+    return CompactData(new_bases[0], compacts[0], base_changed[0])
+
+
+def get_compact_data_batch(rates, bases):
+    """Calculate compact data of many rates at once, see get_compact_data.
+
+    Args:
+        rates: values of new sell/buy prices
+        bases: values of current sell/buy prices at contract
+
+    Returns:
+        new_bases, compacts, base_changed: lists of new base rates, compact
+        values and whether the base rate changed, in the order of rates.
+    """
+    new_bases = []
+    compacts = []
+    base_changed = []
+    for rate, base in zip(rates, bases):
+        if base == 0:
+            new_bases.append(rate)
+            compacts.append(0)
+            base_changed.append(base != rate)
+            continue
+
+        compact = int((rate/base - 1) * 1000)
+        if -128 < compact < 127:
+            # two's complement byte of the compact value
+            new_bases.append(base)
+            compacts.append(compact & 0xFF)
+            base_changed.append(False)
+        else:  # not fit in a byte
+            new_bases.append(rate)
+            compacts.append(0)
+            base_changed.append(True)
+    return new_bases, compacts, base_changed
+
+
+def get_web3(provider, account):
+    """Return a Web3 instance for provider.
+
+    Args:
+        provider: web3 provider, or a Web3 instance which is returned as is
+        account: default account of a Web3 instance created for provider
+    """
+    if isinstance(provider, Web3):
+        return provider
+    w3 = Web3(provider)
+    w3.eth.defaultAccount = account.address
+    return w3
+
+
+def call_view(contract, fn_name, args):
+    """Call a read-only contract function through its ContractCaller.
+
+    Args:
+        contract: the web3 contract instance
+        fn_name: the function name
+        args: the function arguments
+    """
+    return getattr(get_caller(contract), fn_name)(*args)
+
+
+def is_unchanged(price, compact_data):
+    """Return true if price does not change the token rates at contract.
+
+    Args:
+        price: price data of a token, see build_prices
+        compact_data: current compact data of the token at contract, as
+            returned by getCompactData
+    """
+    _, _, compact_buy, compact_sell = compact_data
+    return not (price['base_changed'] or
+                price['compact_buy'] != compact_buy[0] or
+                price['compact_sell'] != compact_sell[0])
 
-    compact = int((rate/base - 1) * 1000)
-    if compact <= -128 or compact >= 127:  # not fit in a byte
-        return CompactData(rate, 0, base_changed=True)
-    else:
-        # handle negative value to convert to byte
-        if compact < 0:
-            compact += 256
-        return CompactData(base, compact, base_changed=False)
+
+def get_changed_prices(prices, compact_data, token_indices):
+    """Return the prices of the compact data rows which have a changed rate.
+
+    A row is kept if one of its tokens changes base rate or has a compact
+    value different from the one at contract. All prices of a kept row are
+    returned since the contract overwrites the whole row.
+
+    Args:
+        prices: price data of tokens, see build_prices
+        compact_data: current compact data of the tokens at contract, as
+            returned by getCompactData
+        token_indices: index of token in compact data on contract
+    """
+    changed_rows = {
+        token_indices[p['token']].array_idx
+        for p, data in zip(prices, compact_data)
+        if not is_unchanged(p, data)
+    }
+    return [
+        p for p in prices
+        if token_indices[p['token']].array_idx in changed_rows
+    ]
+
+
+@functools.lru_cache(maxsize=1024)
+def withdraw_address_key(token, address):
+    """Return the key of approvedWithdrawAddresses in reserve contract, which
+    is keccak256(abi.encodePacked(token, address)).
+
+    Raises InvalidAddress if token or address is not a checksum address, as
+    Web3.soliditySha3 does.
+    """
+    validate_address(token)
+    validate_address(address)
+    return keccak(to_canonical_address(token) + to_canonical_address(address))
+
+
+def build_prices(tokens, buy_rates, sell_rates, base_buy_rates,
+                 base_sell_rates):
+    """Calculate price data of many tokens in a single pass.
+
+    Args:
+        tokens: token addresses
+        buy_rates: new buy prices
+        sell_rates: new sell prices
+        base_buy_rates: current base buy prices at contract
+        base_sell_rates: current base sell prices at contract
+
+    Returns:
+        list of price data, one dict per token. See
+        ConversionRatesContract.build_price for the dict fields.
+    """
+    base_buy, compact_buy, buy_changed = get_compact_data_batch(
+        buy_rates, base_buy_rates)
+    base_sell, compact_sell, sell_changed = get_compact_data_batch(
+        sell_rates, base_sell_rates)
+    return [
+        {
+            'token': token,
+            'base_buy': b_buy,
+            'base_sell': b_sell,
+            'compact_buy': c_buy,
+            'compact_sell': c_sell,
+            'base_changed': changed_buy or changed_sell
+        }
+        for token, b_buy, b_sell, c_buy, c_sell, changed_buy, changed_sell
+        in zip(tokens, base_buy, base_sell, compact_buy, compact_sell,
+               buy_changed, sell_changed)
+    ]
 
 
 def build_compact_price(prices, token_indices):
     """Prepare compact price to setCompactData through pricing contract.
 
+    Only the compact data rows holding a token of prices are emitted. A row
+    is emitted even if all its values are zero: the contract overwrites the
+    whole row, which resets previous compact values of the tokens, and
+    records the update block that rates validity is counted from.
+
     Args:
         prices: price change in bps unit
         token_indices: index of token in compact data on contract
@@ -48,31 +201,27 @@ def build_compact_price(prices, token_indices):
     Return:
         buy: buy prices change in bps unit, encoded in hex
         sell: sell prices change in bps unit, encoded in hex
-        indices: the index of block token in compact data on contract
+        indices: the index of block token in compact data on contract, in the
+            order the rows are first seen in prices
     """
     result = {}
+    indices = []
 
     for p in prices:
-        array_idx = token_indices[p['token']].array_idx
-        field_idx = token_indices[p['token']].field_idx
+        array_idx, field_idx = token_indices[p['token']]
 
         if array_idx not in result:
             result[array_idx] = {
-                'buy': [0] * 14,
-                'sell': [0] * 14
+                'buy': bytearray(14),
+                'sell': bytearray(14)
             }
+            indices.append(array_idx)
 
-        result[array_idx]['buy'][field_idx] = p['compact_buy']
-        result[array_idx]['sell'][field_idx] = p['compact_sell']
-
-    buy = []
-    sell = []
-    indices = []
+        result[array_idx]['buy'][field_idx] = p['compact_buy'] & 0xFF
+        result[array_idx]['sell'][field_idx] = p['compact_sell'] & 0xFF
 
-    for k, v in result.items():
-        buy.append(hexlify(v['buy']))
-        sell.append(hexlify(v['sell']))
-        indices.append(k)
+    buy = [hexlify(result[k]['buy']) for k in indices]
+    sell = [hexlify(result[k]['sell']) for k in indices]
 
     return buy, sell, indices
 
@@ -82,31 +231,48 @@ class BaseContract:
     reserve.
     """
 
+    """Getters included in a reserve snapshot, as (key, function) pairs."""
+    state_functions = (
+        ('admin', 'admin'),
+        ('pending_admin', 'pendingAdmin'),
+        ('operators', 'getOperators'),
+        ('alerters', 'getAlerters'),
+    )
+
     def __init__(self, provider, account, address, abi):
-        """Create new BaseContract instance."""
-        self.w3 = Web3(provider)
-        self.contract = self.w3.eth.contract(address=address, abi=abi)
+        """Create new BaseContract instance.
+
+        :arg provider: web3 provider, or a Web3 instance to share its
+            connection with other contracts
+        :arg account: account to sign transactions
+        :arg str address: the address of smart contract
+        :arg abi: the ABI of smart contract
+        """
+        self.w3 = get_web3(provider, account)
+        self.contract = get_contract_factory(self.w3, abi)(address)
         self.account = account
-        self.w3.eth.defaultAccount = account.address
+        self.caller = get_caller(self.contract)
+        self._multicall_deployed = None
+        self._multicall_contract = None
 
     def admin(self):
         """Get current admin address of contract."""
-        return self.contract.functions.admin().call()
+        return self.caller.admin()
 
     def pending_admin(self):
         """Get pending admin address of contract.
         An admin address is placed in pending if it is tranfered but
         hasnt been claimed yet.
         """
-        return self.contract.functions.pendingAdmin().call()
+        return self.caller.pendingAdmin()
 
     def operators(self):
         """Get operator addresses of contract."""
-        return self.contract.functions.getOperators().call()
+        return self.caller.getOperators()
 
     def alerters(self):
         """Get alerter addresses of contract."""
-        return self.contract.functions.getAlerters().call()
+        return self.caller.getAlerters()
 
     def transfer_admin(self, address):
         """Transfer admin privilege to given address.
@@ -169,9 +335,13 @@ class BaseContract:
         )
 
     def change_account(self, account):
-        """Set account to sign tx when execute contract functions."""
+        """Set account to sign tx when execute contract functions.
+
+        The default account of the Web3 instance is left unchanged, as it
+        may be shared with other contracts: w3.eth.defaultAccount keeps the
+        account the instance was created with.
+        """
         self.account = account
-        self.w3.eth.defaultAccount = account.address
 
     def call_contract_func(self, func):
         """Send transaction to execute contract function.
@@ -181,17 +351,66 @@ class BaseContract:
         """
         return call_contract(self.w3, self.account, func)
 
+    def batch_call(self, calls):
+        """Execute read-only contract calls. The calls are sent in a single
+        request through Multicall3 if it is deployed on the chain, otherwise
+        they are sent concurrently, up to MAX_CONCURRENT_CALLS at a time.
+
+        :arg list calls: list of (contract, fn_name, args) tuples
+        :return: list of results, in the same order as calls
+        """
+        if self._use_multicall():
+            return multicall.aggregate(self.w3, calls)
+        return self._call_each(calls)
+
+    def batch_call_with_block_number(self, calls):
+        """Execute read-only contract calls as batch_call does, and return
+        the latest block number along with the results. The block number is
+        read in the same Multicall3 request when possible.
+
+        :arg list calls: list of (contract, fn_name, args) tuples
+        :return: the block number and the list of results
+        """
+        if self._use_multicall():
+            results = multicall.aggregate(
+                self.w3,
+                calls + [(self._multicall_contract, 'getBlockNumber', [])]
+            )
+            return results[-1], results[:-1]
+        return self.w3.eth.blockNumber, self._call_each(calls)
+
+    def _call_each(self, calls):
+        if len(calls) < 2:
+            return [call_view(*c) for c in calls]
+        with futures.ThreadPoolExecutor(
+                max_workers=min(len(calls), MAX_CONCURRENT_CALLS)) as executor:
+            return list(executor.map(lambda c: call_view(*c), calls))
+
+    def _use_multicall(self):
+        if self._multicall_deployed is None:
+            self._multicall_deployed = multicall.is_deployed(self.w3)
+            if self._multicall_deployed:
+                self._multicall_contract = multicall.get_contract(self.w3)
+        return self._multicall_deployed
+
 
 class ReserveContract(BaseContract):
     """ReserveContract represent the KyberNetwork reserve smart contract."""
 
+    state_functions = BaseContract.state_functions + (
+        ('trade_enabled', 'tradeEnabled'),
+        ('network_address', 'kyberNetwork'),
+        ('conversion_rates_address', 'conversionRatesContract'),
+        ('sanity_rates_address', 'sanityRatesContract'),
+    )
+
     def __init__(self, provider, account, address):
         """Create ReserveContract instance given an address."""
         super().__init__(provider, account, address, RESERVE_CODE.abi)
 
     def trade_enabled(self):
         """Return true if the reserve is tradable."""
-        return self.contract.functions.tradeEnabled().call()
+        return self.caller.tradeEnabled()
 
     def approved_withdraw_addresses(self, address, token):
         """Return true if the given address is allowed to withdraw from reserve
@@ -200,8 +419,8 @@ class ReserveContract(BaseContract):
         :arg str address: Account address
         :arg str token: The Token address
         """
-        sha = Web3.soliditySha3(['address', 'address'], [token, address])
-        return self.contract.functions.approvedWithdrawAddresses(sha).call()
+        return self.caller.approvedWithdrawAddresses(
+            withdraw_address_key(token, address))
 
     def get_balance(self, token):
         """Return balance of given token.
@@ -209,7 +428,7 @@ class ReserveContract(BaseContract):
         :arg str token: Token address
         :return: The balance of token
         """
-        return self.contract.functions.getBalance(token).call()
+        return self.caller.getBalance(token)
 
     def enable_trade(self):
         """Enable trading feature for reserve contract."""
@@ -270,13 +489,13 @@ class ReserveContract(BaseContract):
         )
 
     def get_sanity_rates_address(self):
-        return self.contract.functions.sanityRatesContract().call()
+        return self.caller.sanityRatesContract()
 
     def get_network_address(self):
-        return self.contract.functions.kyberNetwork().call()
+        return self.caller.kyberNetwork()
 
     def get_conversion_rates_address(self):
-        return self.contract.functions.conversionRatesContract().call()
+        return self.caller.conversionRatesContract()
 
 
 class ConversionRatesContract(BaseContract):
@@ -284,16 +503,31 @@ class ConversionRatesContract(BaseContract):
     smart contract.
     """
 
-    def __init__(self, provider, account, address):
+    state_functions = BaseContract.state_functions + (
+        ('reserve_address', 'reserveContract'),
+    )
+
+    def __init__(self, provider, account, address, cache_dir=None):
         """Create new ConversionRatesContract instance.
 
         :arg provider: A web3 provider
         :arg account: Account to sign transactions.
         :arg str address: The address of smart contract
+        :arg str cache_dir: Directory to persist token indices across
+            processes, eg: ~/.cache/reserve_sdk. Token indices are only
+            cached in memory if it is not set. The cache file is keyed by
+            network id and contract address, as the same deployer gets the
+            same contract address on different chains.
         """
         super().__init__(provider, account, address, CONVERSION_RATES_CODE.abi)
-        self.token_indices = {}
-        self.executor = futures.ThreadPoolExecutor(max_workers=4)
+        self.token_indices_file = None
+        if cache_dir is not None:
+            self.token_indices_file = os.path.join(
+                os.path.expanduser(cache_dir),
+                'token_indices-{}-{}.json'.format(
+                    self.w3.version.network, address)
+            )
+        self.token_indices = self._load_token_indices()
 
     def get_buy_rate(self, token, qty, block_number=0):
         """Return the buying rate (ETH based). The rate might be vary with
@@ -304,12 +538,12 @@ class ConversionRatesContract(BaseContract):
         :arg int block_number: The block number to get rate from, default value
             0 means latest block number
         """
-        return self.contract.functions.getRate(
+        return self.caller.getRate(
             token,
             block_number,
             True,  # buy = True
             qty
-        ).call()
+        )
 
     def get_sell_rate(self, token, qty, block_number=0):
         """Return the selling rate (ETH based). The rate might be vary with
@@ -320,12 +554,12 @@ class ConversionRatesContract(BaseContract):
         :arg int block_number: The block number to get rate from, default value
             0 means latest block number
         """
-        return self.contract.functions.getRate(
+        return self.caller.getRate(
             token,
             block_number,
             False,  # buy = False -> sell
             qty
-        ).call()
+        )
 
     def get_token_indices(self, token):
         """Get token index in pricing contract compact data.
@@ -335,17 +569,77 @@ class ConversionRatesContract(BaseContract):
         Returns array index and field index of token in compact data.
         """
         if token not in self.token_indices:
-            arr_idx, field_idx, _, _ = self.contract.functions.getCompactData(
-                token).call()
+            arr_idx, field_idx, _, _ = self.caller.getCompactData(token)
             self.token_indices[token] = TokenIndex(arr_idx, field_idx)
+            self._save_token_indices()
         return self.token_indices[token]
 
-    def build_price(self, token, buy, sell):
+    def _bulk_get_compact_data(self, tokens):
+        """Fetch indices of the tokens missing from cache in a single batch."""
+        missing = [t for t in tokens if t not in self.token_indices]
+        if not missing:
+            return
+        results = self.batch_call([
+            (self.contract, 'getCompactData', [t]) for t in missing
+        ])
+        self._update_token_indices(missing, results)
+
+    def _update_token_indices(self, tokens, compact_data):
+        """Cache indices of the tokens missing from cache, taken from their
+        getCompactData results.
+        """
+        missing = False
+        for token, (arr_idx, field_idx, _, _) in zip(tokens, compact_data):
+            if token not in self.token_indices:
+                self.token_indices[token] = TokenIndex(arr_idx, field_idx)
+                missing = True
+        if missing:
+            self._save_token_indices()
+
+    def invalidate_token_indices(self):
+        """Clear cached token indices, in memory and on disk."""
+        self.token_indices = {}
+        if self.token_indices_file is not None and os.path.exists(
+                self.token_indices_file):
+            os.remove(self.token_indices_file)
+
+    def _load_token_indices(self):
+        if self.token_indices_file is None or not os.path.exists(
+                self.token_indices_file):
+            return {}
+        try:
+            with open(self.token_indices_file) as f:
+                return {
+                    token: TokenIndex(*indices)
+                    for token, indices in json.load(f).items()
+                }
+        except (OSError, ValueError, TypeError, AttributeError):
+            # unreadable cache is ignored and overwritten on next save
+            return {}
+
+    def _save_token_indices(self):
+        if self.token_indices_file is None:
+            return
+        cache_dir = os.path.dirname(self.token_indices_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+                'w', dir=cache_dir, delete=False) as f:
+            try:
+                json.dump(self.token_indices, f)
+            except Exception:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, self.token_indices_file)
+
+    def build_price(self, token, buy, sell, base_buy, base_sell):
         """Calculate price data.
 
-        :arg list(str) token: the token address
-        :arg list(int) buy: token buy price
-        :arg list(int) sell: token sell price
+        :arg str token: the token address
+        :arg int buy: token buy price
+        :arg int sell: token sell price
+        :arg int base_buy: current base buy price at contract
+        :arg int base_sell: current base sell price at contract
 
         :return: token, base buy and sell, compact buy and sell, base_changed
 
@@ -360,24 +654,11 @@ class ConversionRatesContract(BaseContract):
                 new base rate. Otherwise, the compact price will be set
 
         """
-        base_buy = self.get_basic_rate(token, True)
-        compact_buy = get_compact_data(buy, base_buy)
-
-        base_sell = self.get_basic_rate(token, False)
-        compact_sell = get_compact_data(sell, base_sell)
-
-        base_changed = compact_buy.base_changed or compact_sell.base_changed
-
-        return {
-            'token': token,
-            'base_buy': compact_buy.base,
-            'base_sell': compact_sell.base,
-            'compact_buy': compact_buy.compact,
-            'compact_sell': compact_sell.compact,
-            'base_changed': base_changed
-        }
+        return build_prices(
+            [token], [buy], [sell], [base_buy], [base_sell])[0]
 
-    def set_rates(self, token_addresses, buy_rates, sell_rates):
+    def set_rates(self, token_addresses, buy_rates, sell_rates,
+                  skip_unchanged=False):
         """Setting rates for tokens.
 
         :arg list(str) token_addresses: list of token contract addresses
@@ -389,15 +670,48 @@ class ConversionRatesContract(BaseContract):
         :arg list(int) sell_rates: list of sell rates in token wei
             eg: 1 KNC = 0.00182 ETH -> 0.00182 * (10**18)
 
+        :arg bool skip_unchanged: only send the compact data rows with a
+            token whose base rate changes or whose compact value differs
+            from the one at contract, and do not send the transaction if
+            there is no such row. Note that rates expire
+            validRateDurationInBlocks after the last update of their row,
+            skipped rows do not extend their validity.
+
+        :return: The transaction hash, or None if the update is skipped
         """
 
-        token_indices = {}
-        for idx, indices in enumerate(self.executor.map(
-                self.get_token_indices, token_addresses)):
-            token_indices[token_addresses[idx]] = indices
+        if not skip_unchanged:
+            # with skip_unchanged, indices come with the compact data below
+            self._bulk_get_compact_data(token_addresses)
+
+        calls = [
+            (self.contract, 'getBasicRate', [token, buy])
+            for token in token_addresses
+            for buy in (True, False)
+        ]
+        if skip_unchanged:
+            calls += [
+                (self.contract, 'getCompactData', [token])
+                for token in token_addresses
+            ]
+        block_number, results = self.batch_call_with_block_number(calls)
+        if skip_unchanged:
+            self._update_token_indices(
+                token_addresses, results[2 * len(token_addresses):])
+        token_indices = {
+            token: self.token_indices[token] for token in token_addresses
+        }
+        base_rates = results[:2 * len(token_addresses)]
+        prices = build_prices(
+            token_addresses, buy_rates, sell_rates,
+            base_rates[0::2], base_rates[1::2]
+        )
 
-        prices = list(self.executor.map(lambda p: self.build_price(*p), zip(
-            token_addresses, buy_rates, sell_rates)))
+        if skip_unchanged:
+            prices = get_changed_prices(
+                prices, results[2 * len(token_addresses):], token_indices)
+            if not prices:
+                return None
 
         tokens = []
         base_buy = []
@@ -420,7 +734,7 @@ class ConversionRatesContract(BaseContract):
                     base_sell,  # base sell
                     compact_buy,  # compact data
                     compact_sell,  # compact data
-                    self.w3.eth.blockNumber,  # most recent block number
+                    block_number,  # most recent block number
                     indices,  # indicies
                 )
             )
@@ -430,7 +744,7 @@ class ConversionRatesContract(BaseContract):
                 self.contract.functions.setCompactData(
                     compact_buy,
                     compact_sell,
-                    self.w3.eth.blockNumber,
+                    block_number,
                     indices
                 )
             )
@@ -438,8 +752,7 @@ class ConversionRatesContract(BaseContract):
 
     def get_basic_rate(self, token_address, buy=True):
         """Get basic rate from pricing contract."""
-        return self.contract.functions.getBasicRate(
-            token_address, buy).call()
+        return self.caller.getBasicRate(token_address, buy)
 
     def enable_token_trade(self, token):
         return self.call_contract_func(
@@ -499,18 +812,28 @@ class ConversionRatesContract(BaseContract):
             )
         )
 
-    def set_compact_data(self, buy, sell, indices):
+    def set_compact_data(self, buy, sell, indices, block_number=None):
+        """Set compact data of the given indices.
+
+        :arg list(str) buy: buy prices change in bps unit, encoded in hex
+        :arg list(str) sell: sell prices change in bps unit, encoded in hex
+        :arg list(int) indices: the indices of compact data to update
+        :arg int block_number: the block number the rates are computed at,
+            default value None means latest block number
+        """
+        if block_number is None:
+            block_number = self.w3.eth.blockNumber
         return self.call_contract_func(
             self.contract.functions.setCompactData(
                 buy,
                 sell,
-                self.w3.eth.blockNumber,
+                block_number,
                 indices
             )
         )
 
     def get_compact_data(self, token):
-        return self.contract.functions.getCompactData(token).call()
+        return self.caller.getCompactData(token)
 
     def set_reserve_address(self, reserve_addr):
         """Update reserve address."""
@@ -519,14 +842,14 @@ class ConversionRatesContract(BaseContract):
         )
 
     def get_reserve_address(self):
-        return self.contract.functions.reserveContract().call()
+        return self.caller.reserveContract()
 
     def get_step_function_data(self, token, command, param):
-        return self.contract.functions.getStepFunctionData(
+        return self.caller.getStepFunctionData(
             token,
             command,
             param
-        ).call()
+        )
 
     def add_new_token(self, token, minimal_record_resolution,
                       max_per_block_imbalance, max_total_imbalance):
@@ -576,7 +899,7 @@ class SanityRatesContract(BaseContract):
 
     def get_sanity_rates(self, src, dst):
         """Get the sanity rates for 1 token vs. ETH."""
-        return self.contract.functions.getSanityRate(src, dst).call()
+        return self.caller.getSanityRate(src, dst)
 
     def set_reasonable_diff(self, tokens, diff):
         """Set reasonable conversion rate difference in percentage. Any rate
@@ -591,7 +914,7 @@ class SanityRatesContract(BaseContract):
 
     def get_reasonable_diff_in_bps(self, token):
         """Get the reasonable difference in basis points for token."""
-        return self.contract.functions.reasonableDiffInBps(token).call()
+        return self.caller.reasonableDiffInBps(token)
 
 
 class Reserve:
@@ -605,16 +928,40 @@ class Reserve:
         * Enable/Disable trading function
     """
 
-    def __init__(self, provider, account, addresses):
-        """Create a Reserve instance.
+    def __init__(self, provider, account, addresses, cache_dir=None):
+        """Create a Reserve instance. The reserve contracts share a single
+        Web3 instance.
 
-        :arg provider: web3 provider
+        :arg provider: web3 provider, or a Web3 instance
         :arg addresses: addresses of deployed smart contracts
+        :arg str cache_dir: directory to persist pricing token indices
         """
+        w3 = get_web3(provider, account)
         self.fund = ReserveContract(
-            provider, account, addresses.reserve)
+            w3, account, addresses.reserve)
         self.pricing = ConversionRatesContract(
-            provider, account, addresses.conversion_rates)
+            w3, account, addresses.conversion_rates, cache_dir)
         self.sanity = SanityRatesContract(
-            provider, account, addresses.sanity_rates
+            w3, account, addresses.sanity_rates
+        )
+
+    def snapshot(self):
+        """Return the current state of all reserve contracts. The state is
+        read in a single request if Multicall3 is deployed on the chain.
+
+        :return: dict of contract states, keyed by fund, pricing and sanity
+        """
+        contracts = (
+            ('fund', self.fund),
+            ('pricing', self.pricing),
+            ('sanity', self.sanity),
         )
+        results = iter(self.fund.batch_call([
+            (c.contract, fn_name, [])
+            for _, c in contracts
+            for _, fn_name in c.state_functions
+        ]))
+        return {
+            name: {key: next(results) for key, _ in c.state_functions}
+            for name, c in contracts
+        }
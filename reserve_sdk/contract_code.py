@@ -22,3 +22,21 @@ SANITY_RATES_CODE = ContractCode(
     contract_codes['sanity_rates']['abi'],
     contract_codes['sanity_rates']['bytecode'],
 )
+
+
+def get_contract_factory(w3, abi):
+    """Return the contract factory of abi bound to w3.
+
+    The factory is built once per web3 instance and abi object, so
+    instantiating many contracts of the same abi skips the abi processing.
+    The cache is kept on the web3 instance to share its lifetime.
+
+    Args:
+        w3: web3 instance
+        abi: the contract abi
+    """
+    factories = w3.__dict__.setdefault('_reserve_sdk_contract_factories', {})
+    if id(abi) not in factories:
+        # keep abi referenced so that its id is not reused
+        factories[id(abi)] = (abi, w3.eth.contract(abi=abi))
+    return factories[id(abi)][1]
@@ -15,7 +15,6 @@ class Deployer:
     def __init__(self, provider, account):
         """Create a deployer instance given a provider.
         """
-        self.__provider = provider
         self.__w3 = Web3(provider)
         self.__w3.eth.defaultAccount = account.address
         self.__acct = account
@@ -63,7 +62,7 @@ class Deployer:
 
         # Link addresses between reserve contracts
         # Consider to move this part to Reserve class
-        reserve = Reserve(self.__provider, self.__acct, addresses)
+        reserve = Reserve(self.__w3, self.__acct, addresses)
         reserve.pricing.set_reserve_address(reserve_addr)
         reserve.fund.set_contracts(
             network_addr,
@@ -0,0 +1,71 @@
+from eth_abi import decode_abi, encode_abi
+from eth_utils import encode_hex, function_signature_to_4byte_selector
+from web3.utils.contracts import find_matching_fn_abi
+
+from .caller import decode_output
+
+
+"""Multicall3 is deployed at the same address on most EVM chains."""
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+AGGREGATE3_SELECTOR = function_signature_to_4byte_selector(
+    'aggregate3((address,bool,bytes)[])')
+
+"""Multicall3 view functions which can be batched along with other calls."""
+MULTICALL3_ABI = [
+    {
+        'constant': True,
+        'inputs': [],
+        'name': 'getBlockNumber',
+        'outputs': [{'name': 'blockNumber', 'type': 'uint256'}],
+        'payable': False,
+        'stateMutability': 'view',
+        'type': 'function'
+    },
+]
+
+
+def is_deployed(w3):
+    """Return true if Multicall3 contract is deployed on the connected chain.
+
+    Args:
+        w3: web3 instance
+    """
+    return len(w3.eth.getCode(MULTICALL3_ADDRESS)) > 0
+
+
+def get_contract(w3):
+    """Return the Multicall3 contract instance.
+
+    Args:
+        w3: web3 instance
+    """
+    return w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+
+def aggregate(w3, calls):
+    """Execute read-only contract calls in a single eth_call through the
+    Multicall3 contract.
+
+    Args:
+        w3: web3 instance
+        calls: list of (contract, fn_name, args) tuples
+
+    Returns list of decoded results, in the same order as calls.
+    """
+    encoded_calls = [
+        (contract.address, False, bytes.fromhex(
+            contract.encodeABI(fn_name=fn_name, args=args)[2:]))
+        for contract, fn_name, args in calls
+    ]
+    return_data = w3.eth.call({
+        'to': MULTICALL3_ADDRESS,
+        'data': encode_hex(AGGREGATE3_SELECTOR + encode_abi(
+            ['(address,bool,bytes)[]'], [encoded_calls]))
+    })
+    results = decode_abi(['(bool,bytes)[]'], return_data)[0]
+    return [
+        decode_output(
+            contract, find_matching_fn_abi(contract.abi, fn_name, args), data)
+        for (contract, fn_name, args), (_, data) in zip(calls, results)
+    ]
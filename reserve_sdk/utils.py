@@ -1,6 +1,3 @@
-import binascii
-
-
 def call_contract(w3, account, func):
     """Send transaction to execute smart contract function.
 
@@ -12,8 +9,9 @@ def call_contract(w3, account, func):
     Returns transaction hash.
     """
     tx = func.buildTransaction({
+        'from': account.address,
         'nonce': w3.eth.getTransactionCount(account.address),
-        'gas': func.estimateGas()
+        'gas': func.estimateGas({'from': account.address})
     })
     signed_tx = w3.eth.account.signTransaction(tx, account.privateKey)
     tx_hash = w3.eth.sendRawTransaction(signed_tx.rawTransaction)
@@ -43,7 +41,10 @@ def deploy_contract(w3, account, contract_code, contract_args):
 
 
 def hexlify(arr):
-    return '0x{}'.format(binascii.hexlify(bytearray(arr)).decode())
+    """Encode bytes, or a list of byte values, to a 0x prefixed hex string."""
+    if not isinstance(arr, (bytes, bytearray)):
+        arr = bytes(arr)
+    return '0x' + arr.hex()
 
 
 def token_wei(value, decimals):
@@ -1,6 +1,8 @@
 import random
 
-from reserve_sdk.contract import get_compact_data, build_compact_price
+from reserve_sdk.contract import (
+    get_compact_data, get_compact_data_batch, build_prices,
+    build_compact_price, get_changed_prices)
 from reserve_sdk.contract import TokenIndex, CompactData
 from reserve_sdk.utils import hexlify
 
@@ -34,8 +36,47 @@ def test_compact_data_with_zero_base_rates():
     assert get_compact_data(0, 0) == CompactData(0, 0, False)
 
 
-def check_list_equal(l1, l2):
-    return len(l1) == len(l2) and sorted(l1) == sorted(l2)
+def test_compact_data_batch():
+    base_rate = 500 * 10**18
+    rates = [int(base_rate * 1.01), int(base_rate * 0.99), base_rate * 2, 100]
+    bases = [base_rate, base_rate, base_rate, 0]
+
+    new_bases, compacts, base_changed = get_compact_data_batch(rates, bases)
+
+    assert new_bases == [base_rate, base_rate, base_rate * 2, 100]
+    assert abs(compacts[0] - 10) <= 1
+    assert abs(compacts[1] - (256 - 10)) <= 1
+    assert compacts[2:] == [0, 0]
+    assert base_changed == [False, False, True, True]
+    assert [get_compact_data(r, b) for r, b in zip(rates, bases)] == [
+        CompactData(*c) for c in zip(new_bases, compacts, base_changed)]
+
+
+def test_build_prices():
+    addr_1 = '0x14535eE720e329f66071B86486763Da4637034aE'
+    addr_2 = '0x24535eE720e329f66071B86486763Da4637034aE'
+    base_buy = 500 * 10**18
+    base_sell = 2 * 10**15
+
+    prices = build_prices(
+        [addr_1, addr_2],
+        [int(base_buy * 1.01), int(base_buy * 1.2)],
+        [int(base_sell * 0.99), base_sell],
+        [base_buy, base_buy],
+        [base_sell, base_sell]
+    )
+
+    assert prices[0]['token'] == addr_1
+    assert prices[0]['base_buy'] == base_buy
+    assert abs(prices[0]['compact_buy'] - 10) <= 1
+    assert abs(prices[0]['compact_sell'] - (256 - 10)) <= 1
+    assert not prices[0]['base_changed']
+
+    assert prices[1]['token'] == addr_2
+    assert prices[1]['base_buy'] == int(base_buy * 1.2)
+    assert prices[1]['compact_buy'] == 0
+    assert prices[1]['compact_sell'] == 0
+    assert prices[1]['base_changed']
 
 
 def test_build_compact_price():
@@ -70,14 +111,59 @@ def test_build_compact_price():
     compact_buy, compact_sell, indices = build_compact_price(
         prices, token_indices)
 
-    assert check_list_equal(indices, [3, 9])
+    assert indices == [3, 9]
 
-    assert check_list_equal(compact_buy, [
+    assert compact_buy == [
         hexlify([0, 0, 0, 0, 0, 0, 0, 0, 0, 23, 0, 0, 0, 0]),
         hexlify([0, 0, 0, 0, 0, 24, 25, 0, 0, 0, 0, 0, 0, 0])
-    ])
+    ]
 
-    assert check_list_equal(compact_sell, [
+    assert compact_sell == [
         hexlify([0, 0, 0, 0, 0, 0, 0, 0, 0, 26, 0, 0, 0, 0]),
         hexlify([0, 0, 0, 0, 0, 27, 28, 0, 0, 0, 0, 0, 0, 0])
-    ])
+    ]
+
+
+def test_hexlify():
+    assert hexlify([0, 1, 127, 255]) == '0x00017fff'
+    assert hexlify(bytearray([0, 1, 127, 255])) == '0x00017fff'
+
+
+def test_get_changed_prices():
+    addr_1 = '0x14535eE720e329f66071B86486763Da4637034aE'
+    addr_2 = '0x24535eE720e329f66071B86486763Da4637034aE'
+    addr_3 = '0x34535eE720e329f66071B86486763Da4637034aE'
+    addr_4 = '0x44535eE720e329f66071B86486763Da4637034aE'
+
+    def price(token, compact_buy, compact_sell, base_changed=False):
+        return {
+            'token': token,
+            'compact_buy': compact_buy,
+            'compact_sell': compact_sell,
+            'base_changed': base_changed
+        }
+
+    prices = [
+        price(addr_1, 10, 0),  # unchanged, in a changed row
+        price(addr_2, 12, 0),  # compact buy changed
+        price(addr_3, 5, 250),  # unchanged row
+        price(addr_4, 0, 0, base_changed=True)
+    ]
+    compact_data = [
+        (0, 0, b'\x0a', b'\x00'),
+        (0, 1, b'\x0b', b'\x00'),
+        (1, 0, b'\x05', b'\xfa'),
+        (2, 0, b'\x00', b'\x00'),
+    ]
+    token_indices = {
+        addr_1: TokenIndex(0, 0),
+        addr_2: TokenIndex(0, 1),
+        addr_3: TokenIndex(1, 0),
+        addr_4: TokenIndex(2, 0)
+    }
+
+    changed = get_changed_prices(prices, compact_data, token_indices)
+    assert [p['token'] for p in changed] == [addr_1, addr_2, addr_4]
+
+    assert get_changed_prices(
+        prices[2:3], compact_data[2:3], token_indices) == []
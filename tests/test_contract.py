@@ -1,13 +1,22 @@
 import unittest
 import json
 import os
+import tempfile
 from functools import wraps
 import random
 
+from eth_abi import decode_abi, encode_abi
 from eth_tester import EthereumTester, PyEVMBackend
+from eth_utils import (
+    decode_hex, encode_hex, function_signature_to_4byte_selector,
+    to_checksum_address)
 from web3 import Web3, EthereumTesterProvider
+from web3.exceptions import (
+    BadFunctionCallOutput, InvalidAddress, ValidationError)
 
-from reserve_sdk import Deployer, ReserveContract, Reserve
+from reserve_sdk import (
+    Deployer, ReserveContract, ConversionRatesContract, Reserve, multicall)
+from reserve_sdk.contract import withdraw_address_key
 from reserve_sdk.utils import deploy_contract, token_wei
 from reserve_sdk.contract_code import ContractCode
 from reserve_sdk.token import Token
@@ -84,6 +93,14 @@ class TestBaseContract(unittest.TestCase):
     def test_get_contract_alerters(self):
         self.assertEqual(type(self.contract.alerters()), list)
 
+    def test_caller(self):
+        self.assertEqual(
+            self.contract.caller.getOperators(),
+            self.contract.contract.functions.getOperators().call()
+        )
+        with self.assertRaises(AttributeError):
+            self.contract.caller.unknownFunction
+
     def test_transfer_admin(self):
         self.contract.transfer_admin(admin_2.address)
         self.assertIn(admin_2.address, self.contract.pending_admin())
@@ -125,6 +142,160 @@ class TestBaseContract(unittest.TestCase):
         self.assertNotIn(alerter.address, self.contract.alerters())
 
 
+class TestReserve(unittest.TestCase):
+
+    def test_contracts_share_web3(self):
+        self.assertIs(reserve.fund.w3, reserve.pricing.w3)
+        self.assertIs(reserve.fund.w3, reserve.sanity.w3)
+
+    def test_contracts_share_factory(self):
+        other = Reserve(reserve.fund.w3, deployer, addresses)
+        self.assertIs(type(other.fund.contract), type(reserve.fund.contract))
+        self.assertIs(
+            type(other.pricing.contract), type(reserve.pricing.contract))
+
+    def test_snapshot(self):
+        snapshot = reserve.snapshot()
+
+        self.assertEqual(snapshot['fund']['admin'], reserve.fund.admin())
+        self.assertEqual(
+            snapshot['fund']['operators'],
+            reserve.fund.operators()
+        )
+        self.assertEqual(
+            snapshot['fund']['trade_enabled'],
+            reserve.fund.trade_enabled()
+        )
+        self.assertEqual(
+            snapshot['fund']['conversion_rates_address'],
+            reserve.fund.get_conversion_rates_address()
+        )
+        self.assertEqual(
+            snapshot['pricing']['reserve_address'],
+            reserve.pricing.get_reserve_address()
+        )
+        self.assertEqual(
+            snapshot['sanity']['alerters'],
+            reserve.sanity.alerters()
+        )
+
+    def test_change_account_keeps_shared_web3(self):
+        other = Reserve(provider, deployer, addresses)
+        other.pricing.change_account(operator)
+        self.assertEqual(other.pricing.account, operator)
+        self.assertEqual(other.fund.account, deployer)
+        self.assertEqual(other.fund.w3.eth.defaultAccount, deployer.address)
+
+    def test_multicall_probe_is_cached(self):
+        other = Reserve(Web3(provider), deployer, addresses)
+        get_code = other.fund.w3.eth.getCode
+        probes = []
+
+        def getCode(address, *args, **kargs):
+            probes.append(address)
+            return get_code(address, *args, **kargs)
+
+        other.fund.w3.eth.getCode = getCode
+        other.snapshot()
+        other.snapshot()
+        other.fund.batch_call_with_block_number(
+            [(other.fund.contract, 'admin', [])])
+        self.assertEqual(probes, [multicall.MULTICALL3_ADDRESS])
+
+
+def stub_multicall(w3):
+    """ Emulate the Multicall3 contract on the eth_tester chain.
+
+    Returns the list of aggregate3 calls the stubbed w3 receives.
+    """
+    eth_call = w3.eth.call
+    get_code = w3.eth.getCode
+    aggregate_calls = []
+
+    def call(transaction, *args, **kargs):
+        if transaction['to'] != multicall.MULTICALL3_ADDRESS:
+            return eth_call(transaction, *args, **kargs)
+        data = decode_hex(transaction['data'])
+        assert data[:4] == multicall.AGGREGATE3_SELECTOR
+        calls = decode_abi(['(address,bool,bytes)[]'], data[4:])[0]
+        aggregate_calls.append(calls)
+        results = []
+        for target, _, call_data in calls:
+            target = to_checksum_address(target)
+            if target == multicall.MULTICALL3_ADDRESS:
+                return_data = encode_abi(['uint256'], [w3.eth.blockNumber])
+            else:
+                return_data = eth_call(
+                    {'to': target, 'data': encode_hex(call_data)})
+            results.append((True, bytes(return_data)))
+        return encode_abi(['(bool,bytes)[]'], [results])
+
+    def getCode(address, *args, **kargs):
+        if address == multicall.MULTICALL3_ADDRESS:
+            return b'\x01'
+        return get_code(address, *args, **kargs)
+
+    w3.eth.call = call
+    w3.eth.getCode = getCode
+    return aggregate_calls
+
+
+class TestMulticall(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        ConversionRatesContract(
+            provider, deployer, addresses.conversion_rates).add_new_token(
+            token=tokens[2].address,
+            minimal_record_resolution=token_wei(0.0001, 18),
+            max_per_block_imbalance=token_wei(439.79, 18),
+            max_total_imbalance=token_wei(922.36, 18)
+        )
+
+    def setUp(self):
+        self.multicall_reserve = Reserve(Web3(provider), deployer, addresses)
+        self.aggregate_calls = stub_multicall(self.multicall_reserve.fund.w3)
+        for contract in (reserve.pricing, self.multicall_reserve.pricing):
+            # return the transaction function instead of sending it
+            contract.call_contract_func = lambda func: (func.fn_name,
+                                                        func.args)
+
+    def tearDown(self):
+        del reserve.pricing.call_contract_func
+
+    def test_snapshot(self):
+        self.assertEqual(self.multicall_reserve.snapshot(), reserve.snapshot())
+        self.assertEqual(len(self.aggregate_calls), 1)
+
+    def test_call_undeployed_contract(self):
+        contract = ReserveContract(
+            self.multicall_reserve.fund.w3, deployer, NETWORK_ADDR)
+        with self.assertRaisesRegex(
+                BadFunctionCallOutput, 'is contract deployed correctly'):
+            contract.batch_call([(contract.contract, 'admin', [])])
+
+    def test_set_rates(self):
+        token_addresses = [tokens[2].address]
+        # load token indices, so set_rates needs a single batch
+        self.multicall_reserve.pricing.set_rates(token_addresses, [0], [0])
+
+        for skip_unchanged in (False, True):
+            for buy_rates, sell_rates in [
+                ([token_wei(1, 18)], [token_wei(2, 18)]),
+                ([0], [0]),
+            ]:
+                del self.aggregate_calls[:]
+                self.assertEqual(
+                    self.multicall_reserve.pricing.set_rates(
+                        token_addresses, buy_rates, sell_rates,
+                        skip_unchanged=skip_unchanged),
+                    reserve.pricing.set_rates(
+                        token_addresses, buy_rates, sell_rates,
+                        skip_unchanged=skip_unchanged)
+                )
+                self.assertEqual(len(self.aggregate_calls), 1)
+
+
 class TestReserveContract(unittest.TestCase):
 
     @classmethod
@@ -143,6 +314,28 @@ class TestReserveContract(unittest.TestCase):
             int
         )
 
+    def test_get_balance_non_checksum_address(self):
+        with self.assertRaises(InvalidAddress):
+            self.contract.get_balance(tokens[0].address.lower())
+
+    def test_batch_call_non_checksum_address(self):
+        calls = [
+            (self.contract.contract, 'getBalance', [token.address.lower()])
+            for token in tokens[:2]
+        ]
+        with self.assertRaises(InvalidAddress):
+            self.contract.batch_call(calls)
+
+    def test_get_balance_invalid_argument(self):
+        with self.assertRaises(ValidationError):
+            self.contract.get_balance(1)
+
+    def test_call_undeployed_contract(self):
+        contract = ReserveContract(provider, deployer, NETWORK_ADDR)
+        with self.assertRaisesRegex(
+                BadFunctionCallOutput, 'is contract deployed correctly'):
+            contract.admin()
+
     def test_link_with_new_contract_addresses(self):
         new_addresses = d.deploy(NETWORK_ADDR)
 
@@ -165,6 +358,22 @@ class TestReserveContract(unittest.TestCase):
             new_addresses.sanity_rates
         )
 
+    def test_withdraw_address_key(self):
+        token, address = tokens[0].address, operator.address
+        self.assertEqual(
+            withdraw_address_key(token, address),
+            Web3.soliditySha3(['address', 'address'], [token, address])
+        )
+
+    def test_withdraw_address_key_non_checksum_address(self):
+        token, address = tokens[0].address, operator.address
+        with self.assertRaises(InvalidAddress):
+            withdraw_address_key(token.lower(), address)
+        with self.assertRaises(InvalidAddress):
+            withdraw_address_key(token, address.lower())
+        with self.assertRaises(InvalidAddress):
+            self.contract.approved_withdraw_addresses(address.lower(), token)
+
     def test_approve_and_disapprove_withdraw_address(self):
         token = tokens[0]
         # Check the operator is not approved to withdraw token yet.
@@ -232,6 +441,45 @@ class TestConversionRatesContract(unittest.TestCase):
     def setUp(self):
         self.contract = reserve.pricing
 
+    def test_token_indices_cache(self):
+        token = tokens[0]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            pricing = ConversionRatesContract(
+                provider, deployer, addresses.conversion_rates, cache_dir)
+            indices = pricing.get_token_indices(token.address)
+
+            # new instance loads token indices from cache directory
+            pricing = ConversionRatesContract(
+                provider, deployer, addresses.conversion_rates, cache_dir)
+            self.assertEqual(pricing.token_indices, {token.address: indices})
+            self.assertIn(
+                '-{}-'.format(w3.version.network),
+                os.path.basename(pricing.token_indices_file)
+            )
+
+            pricing.invalidate_token_indices()
+            self.assertEqual(pricing.token_indices, {})
+            self.assertFalse(os.path.exists(pricing.token_indices_file))
+
+    def test_token_indices_corrupt_cache(self):
+        token = tokens[0]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            pricing = ConversionRatesContract(
+                provider, deployer, addresses.conversion_rates, cache_dir)
+            open(pricing.token_indices_file, 'w').close()
+
+            pricing = ConversionRatesContract(
+                provider, deployer, addresses.conversion_rates, cache_dir)
+            self.assertEqual(pricing.token_indices, {})
+
+            # the corrupt cache file is overwritten on next save
+            indices = pricing.get_token_indices(token.address)
+            pricing = ConversionRatesContract(
+                provider, deployer, addresses.conversion_rates, cache_dir)
+            self.assertEqual(pricing.token_indices, {token.address: indices})
+            self.assertEqual(os.listdir(cache_dir),
+                             [os.path.basename(pricing.token_indices_file)])
+
     @role(deployer)
     def test_link_with_new_reserve_contract(self):
         new_address = d.deploy(NETWORK_ADDR)
@@ -506,6 +754,102 @@ class TestConversionRatesContract(unittest.TestCase):
         self.assertLess(abs((sell-new_sell_rates[0])/new_sell_rates[0]), bps)
         self.assertLess(abs((buy-new_buy_rates[0])/new_buy_rates[0]), bps)
 
+    @role(operator)
+    def test_compact_data_reset_to_zero(self):
+        """
+        Set rate with small changes, then set rate back to base rate.
+
+        Expect:
+            compact_data = 0
+            rate = base_rate
+        """
+        token = tokens[0]
+        base_buy_rate = token_wei(500, 18)
+        base_sell_rate = token_wei(0.00182, 18)
+
+        # big changes in both directions to reset base rates
+        self.contract.set_rates(
+            [token.address], [base_buy_rate * 2], [base_sell_rate * 2]
+        )
+        self.contract.set_rates(
+            [token.address], [base_buy_rate], [base_sell_rate]
+        )
+        self.contract.set_rates(
+            [token.address],
+            [int(base_buy_rate * 1.01)],
+            [int(base_sell_rate * 0.99)]
+        )
+        self.contract.set_rates(
+            [token.address], [base_buy_rate], [base_sell_rate]
+        )
+
+        _, _, compact_buy, compact_sell = self.contract.get_compact_data(
+            token.address)
+        self.assertEqual(compact_buy, b'\x00')
+        self.assertEqual(compact_sell, b'\x00')
+        self.assertEqual(
+            self.contract.get_basic_rate(token.address, buy=True),
+            base_buy_rate
+        )
+
+    @role(operator)
+    def test_skip_unchanged_rates(self):
+        token = tokens[0]
+        base_buy_rates = [token_wei(500, 18)]
+        base_sell_rates = [token_wei(0.00182, 18)]
+        new_buy_rates = [int(base_buy_rates[0] * 1.01)]
+
+        # big changes in both directions to reset base rates
+        self.contract.set_rates(
+            [token.address],
+            [base_buy_rates[0] * 2],
+            [base_sell_rates[0] * 2]
+        )
+        self.contract.set_rates(
+            [token.address], base_buy_rates, base_sell_rates)
+        self.contract.set_rates(
+            [token.address], new_buy_rates, base_sell_rates)
+
+        # same rates again, nothing to update
+        self.assertIsNone(self.contract.set_rates(
+            [token.address], new_buy_rates, base_sell_rates,
+            skip_unchanged=True
+        ))
+
+        # back to base rate, compact data need to be reset
+        self.assertIsNotNone(self.contract.set_rates(
+            [token.address], base_buy_rates, base_sell_rates,
+            skip_unchanged=True
+        ))
+        _, _, compact_buy, _ = self.contract.get_compact_data(token.address)
+        self.assertEqual(compact_buy, b'\x00')
+
+    def test_skip_unchanged_rates_cold_cache(self):
+        pricing = ConversionRatesContract(
+            Web3(provider), operator, addresses.conversion_rates)
+        pricing.call_contract_func = lambda func: func.fn_name
+        eth_call = pricing.w3.eth.call
+        selector = encode_hex(
+            function_signature_to_4byte_selector('getCompactData(address)'))
+        compact_data_calls = []
+
+        def call(transaction, *args, **kargs):
+            if transaction['data'].startswith(selector):
+                compact_data_calls.append(transaction)
+            return eth_call(transaction, *args, **kargs)
+
+        pricing.w3.eth.call = call
+        token_addresses = [token.address for token in tokens[:2]]
+        pricing.set_rates(
+            token_addresses, [token_wei(1, 18)] * 2, [token_wei(1, 18)] * 2,
+            skip_unchanged=True
+        )
+        self.assertEqual(len(compact_data_calls), len(token_addresses))
+        self.assertEqual(
+            pricing.token_indices,
+            {t: self.contract.get_token_indices(t) for t in token_addresses}
+        )
+
     @role(operator)
     def test_set_new_rate_with_small_and_big_changes(self):
         """